@@ -0,0 +1,133 @@
+-- Full-text search over IP record titles, keywords and abstracts.
+--
+-- The weighted tsvector lives only in expression GIN indexes on
+-- ip_search_document(title, abstract, details), so Postgres keeps it current on
+-- every insert/update without touching updated_at or firing extra triggers,
+-- and `select('*')` on the base tables does not ship it to the browser.
+-- Weights: title = A, details.keywords = B, abstract = C.
+-- Query through search_ip_records() (SECURITY INVOKER, so RLS still applies;
+-- soft-deleted rows of both tables are excluded), or `ucc-ipo search query`
+-- from the maintenance tooling. Queries must use the same expression to hit the
+-- index, and under RLS only ip_search_matches() can use it (see step 3).
+
+-- 1. Search document builder (IMMUTABLE so it can back an expression index)
+CREATE OR REPLACE FUNCTION public.ip_search_document(
+  p_title    TEXT,
+  p_abstract TEXT,
+  p_details  JSONB
+)
+RETURNS tsvector
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+SET search_path = public, pg_catalog
+AS $$
+  SELECT
+    setweight(to_tsvector('english'::regconfig, coalesce(p_title, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce((
+      SELECT string_agg(keyword, ' ')
+      FROM jsonb_array_elements_text(
+        CASE WHEN jsonb_typeof(p_details -> 'keywords') = 'array'
+             THEN p_details -> 'keywords'
+             ELSE '[]'::jsonb
+        END
+      ) AS keyword
+    ), '')), 'B') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(p_abstract, '')), 'C')
+$$;
+
+-- 2. Expression GIN indexes over the weighted document
+CREATE INDEX IF NOT EXISTS idx_ip_records_search_document
+  ON ip_records USING GIN (public.ip_search_document(title, abstract, details));
+
+CREATE INDEX IF NOT EXISTS idx_legacy_ip_records_search_document
+  ON legacy_ip_records USING GIN (public.ip_search_document(title, abstract, details));
+
+COMMENT ON INDEX idx_ip_records_search_document IS 'Weighted full-text document: title (A), keywords (B), abstract (C)';
+COMMENT ON INDEX idx_legacy_ip_records_search_document IS 'Weighted full-text document: title (A), keywords (B), abstract (C)';
+
+-- 3. Index-backed match helper.
+-- Under RLS, Postgres only uses an index for a clause that is LEAKPROOF, and
+-- ip_search_document(...) @@ tsquery is not, so an INVOKER query over
+-- ip_records falls back to a sequential scan that rebuilds every document.
+-- This SECURITY DEFINER helper does the indexed match and returns only ids;
+-- search_ip_records() joins them back by primary key (uuid equality is
+-- leakproof) so titles, ranks and counts still pass through RLS.
+CREATE OR REPLACE FUNCTION public.ip_search_matches(
+  p_query          tsquery,
+  p_include_legacy BOOLEAN DEFAULT TRUE
+)
+RETURNS TABLE (
+  id     UUID,
+  source TEXT
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public, pg_catalog
+AS $$
+  SELECT r.id, 'ip_records'::TEXT
+  FROM ip_records r
+  WHERE public.ip_search_document(r.title, r.abstract, r.details) @@ p_query
+    AND r.is_deleted = FALSE
+  UNION ALL
+  SELECT l.id, 'legacy_ip_records'::TEXT
+  FROM legacy_ip_records l
+  WHERE p_include_legacy
+    AND public.ip_search_document(l.title, l.abstract, l.details) @@ p_query
+    AND l.is_deleted = FALSE
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.ip_search_matches(tsquery, BOOLEAN) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.ip_search_matches(tsquery, BOOLEAN) TO authenticated;
+
+-- 4. Ranked, paginated search across current and legacy records.
+-- p_query uses web search syntax: "quoted phrases", OR, -excluded.
+-- total_count is the number of visible matches before LIMIT/OFFSET.
+CREATE OR REPLACE FUNCTION public.search_ip_records(
+  p_query          TEXT,
+  p_limit          INTEGER DEFAULT 20,
+  p_offset         INTEGER DEFAULT 0,
+  p_include_legacy BOOLEAN DEFAULT TRUE
+)
+RETURNS TABLE (
+  id          UUID,
+  source      TEXT,
+  title       TEXT,
+  category    TEXT,
+  rank        REAL,
+  total_count BIGINT
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public, pg_catalog
+AS $$
+  WITH q AS (
+    SELECT websearch_to_tsquery('english'::regconfig, coalesce(p_query, '')) AS query
+  ),
+  hits AS (
+    SELECT h.id, h.source
+    FROM q, public.ip_search_matches(q.query, p_include_legacy) h
+  ),
+  matches AS (
+    SELECT r.id, 'ip_records'::TEXT AS source, r.title, r.category::TEXT AS category,
+           ts_rank_cd(public.ip_search_document(r.title, r.abstract, r.details), q.query) AS rank
+    FROM hits h
+    JOIN ip_records r ON r.id = h.id, q
+    WHERE h.source = 'ip_records'
+    UNION ALL
+    SELECT l.id, 'legacy_ip_records'::TEXT, l.title, l.category,
+           ts_rank_cd(public.ip_search_document(l.title, l.abstract, l.details), q.query)
+    FROM hits h
+    JOIN legacy_ip_records l ON l.id = h.id, q
+    WHERE h.source = 'legacy_ip_records'
+  )
+  SELECT m.id, m.source, m.title, m.category, m.rank, count(*) OVER () AS total_count
+  FROM matches m
+  ORDER BY m.rank DESC, m.id
+  LIMIT least(greatest(coalesce(p_limit, 20), 1), 100)
+  OFFSET greatest(coalesce(p_offset, 0), 0)
+$$;
+
+GRANT EXECUTE ON FUNCTION public.search_ip_records(TEXT, INTEGER, INTEGER, BOOLEAN) TO authenticated;
@@ -0,0 +1,133 @@
+"""Startup budget and lazy-import checks for the ucc-ipo command"""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from ucc_ipo import cli
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that must never be imported by --help or --dry-run
+NETWORK_MODULES = ("supabase", "requests", "dotenv", "httpx", "urllib3", "psycopg")
+
+# Extra wall-clock time ucc-ipo may add on top of a bare interpreter start
+STARTUP_BUDGET_SECONDS = 0.15
+
+
+def _python(*args):
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _best_of(runs, *args):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        _python(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@pytest.mark.parametrize("argv", [
+    ["--dry-run", "seed"],
+    ["seed", "--dry-run", "--image", "missing.jpg"],
+    ["--dry-run", "sql"],
+    ["--dry-run", "probe"],
+    ["--dry-run", "snapshot", "dump", "out.uccsnap"],
+    ["--dry-run", "search", "query", "solar dryer"],
+    ["--dry-run", "search", "bench"],
+])
+def test_dry_run_loads_no_network_modules(argv):
+    script = (
+        "import sys, contextlib, io\n"
+        "from ucc_ipo.cli import main\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        f"    code = main({argv!r})\n"
+        f"loaded = [m for m in {NETWORK_MODULES!r} if m in sys.modules]\n"
+        "print(code, ','.join(loaded))\n"
+    )
+    code, _, loaded = _python("-c", script).stdout.rstrip("\n").partition(" ")
+    assert code == "0"
+    assert loaded == ""
+
+
+def test_cli_module_imports_no_subcommands():
+    script = "import sys, ucc_ipo.cli; print(sorted(m for m in sys.modules if m.startswith('ucc_ipo')))"
+    result = _python("-c", script)
+    assert result.stdout.strip() == "['ucc_ipo', 'ucc_ipo.cli']"
+
+
+def test_every_command_has_a_parser():
+    parser = cli.build_parser()
+    extra = {"snapshot": ["dump", "out.uccsnap"], "search": ["query", "solar"]}
+    for name in cli.COMMANDS:
+        args = parser.parse_args(["--dry-run", name, *extra.get(name, [])])
+        assert args.command == name and args.dry_run
+
+
+def test_dry_run_flag_after_subcommand():
+    parser = cli.build_parser()
+    assert parser.parse_args(["seed", "--dry-run"]).dry_run
+    assert not parser.parse_args(["seed"]).dry_run
+
+
+def test_seed_dry_run_lists_all_sections(capsys):
+    assert cli.main(["--dry-run", "seed"]) == 0
+    out = capsys.readouterr().out
+    assert "Would upsert 8 cms_sections" in out
+    assert "HERO" in out and "CTA" in out
+
+
+def test_startup_time_budget():
+    baseline = _best_of(5, "-c", "pass")
+    dry_run = _best_of(5, "-m", "ucc_ipo", "--dry-run", "sql")
+    assert dry_run - baseline < STARTUP_BUDGET_SECONDS, (
+        f"ucc-ipo --dry-run took {dry_run:.3f}s vs {baseline:.3f}s for a bare interpreter"
+    )
+
+
+def test_sql_prints_only_sql_to_stdout(capsys):
+    from ucc_ipo.sql import SQL_SCRIPT
+
+    assert cli.main(["sql"]) == 0
+    captured = capsys.readouterr()
+    assert captured.out == SQL_SCRIPT + "\n"
+    assert "Next steps" in captured.err
+
+
+def test_seed_reads_image_path_after_loading_env(monkeypatch, tmp_path, capsys):
+    from ucc_ipo import seed
+
+    monkeypatch.delenv(seed.IMAGE_ENV_VAR, raising=False)
+    missing = str(tmp_path / "from-dotenv.jpg")
+    monkeypatch.setattr(seed, "load_env", lambda: monkeypatch.setenv(seed.IMAGE_ENV_VAR, missing))
+
+    assert cli.main(["seed"]) == 1
+    assert f"Image not found at: {missing}" in capsys.readouterr().out
+
+
+def test_seed_dry_run_reads_image_path_from_env_file(monkeypatch, tmp_path, capsys):
+    from ucc_ipo import seed
+
+    monkeypatch.delenv(seed.IMAGE_ENV_VAR, raising=False)
+    image = tmp_path / "demo.jpg"
+    image.write_bytes(b"")
+    (tmp_path / ".env").write_text(f'# demo\nexport {seed.IMAGE_ENV_VAR}="{image}"\nVITE_SUPABASE_URL=x\n')
+    (tmp_path / "sub").mkdir()
+    monkeypatch.chdir(tmp_path / "sub")
+
+    assert cli.main(["--dry-run", "seed"]) == 0
+    assert f"Would upload: {image}" in capsys.readouterr().out
+    assert "dotenv" not in sys.modules
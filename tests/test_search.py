@@ -0,0 +1,259 @@
+"""Local BM25 index, indexer and query checks for ucc-ipo search"""
+
+import gzip
+import json
+
+import pytest
+
+from ucc_ipo import cli, search
+from ucc_ipo.snapshot import SnapshotWriter, _copy_escape
+
+
+def _doc(record_id, title, abstract="", keywords="", source="ip_records", updated_at="2026-01-01"):
+    return {
+        "id": record_id,
+        "source": source,
+        "title": title,
+        "abstract": abstract,
+        "keywords": keywords,
+        "category": "patent",
+        "updated_at": updated_at,
+    }
+
+
+@pytest.fixture
+def index():
+    index = search.LocalIndex()
+    index.add(_doc("1", "Solar powered rice dryer", "A dryer for grains using solar panels"))
+    index.add(_doc("2", "Water filtration system", "Low-cost filter", keywords="solar, water"))
+    index.add(_doc("3", "Mobile tutoring app", "Solar is mentioned once in this abstract"))
+    index.add(_doc("4", "Solar dryer (1998)", "Digitised record", source="legacy_ip_records"))
+    return index
+
+
+def test_tokenize_drops_stopwords_and_plurals():
+    assert search.tokenize("The Solar Panels of a Dryer-System") == ["solar", "panel", "dryer", "system"]
+    assert search.tokenize("glass") == ["glass"]
+
+
+def test_title_matches_outrank_keyword_and_abstract_matches(index):
+    result = index.search("solar")
+    assert result.total == 4
+    ids = [hit.id for hit in result.hits]
+    assert ids.index("1") < ids.index("2") < ids.index("3")
+
+
+def test_all_terms_must_match(index):
+    assert {hit.id for hit in index.search("solar dryer").hits} == {"1", "4"}
+    assert index.search("solar unicorn").total == 0
+    assert index.search("the of").total == 0
+
+
+def test_pagination_and_legacy_filter(index):
+    first = index.search("solar", page=1, per_page=3)
+    second = index.search("solar", page=2, per_page=3)
+    assert first.total == second.total == 4
+    assert len(first.hits) == 3 and len(second.hits) == 1
+    assert not {h.id for h in first.hits} & {h.id for h in second.hits}
+    assert "4" not in {hit.id for hit in index.search("solar", include_legacy=False).hits}
+
+
+def test_update_and_remove_are_incremental(index):
+    index.add(_doc("3", "Solar tutoring kiosk", updated_at="2026-02-01"))
+    assert index.search("tutoring").hits[0].title == "Solar tutoring kiosk"
+    assert index.search("mentioned").total == 0
+    assert index.watermarks["ip_records"] == "2026-02-01"
+
+    assert index.remove("ip_records", "2")
+    assert index.search("water").total == 0
+    assert len(index) == 3
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    index.remove("ip_records", "2")
+    path = tmp_path / "records.uccidx"
+    index.save(str(path))
+
+    loaded = search.LocalIndex.load(str(path))
+    assert len(loaded) == 3
+    assert loaded.watermarks == index.watermarks
+    before = [(h.id, round(h.score, 5)) for h in index.search("solar").hits]
+    after = [(h.id, round(h.score, 5)) for h in loaded.search("solar").hits]
+    assert before == after
+
+
+def test_failed_save_keeps_previous_index(index, tmp_path):
+    path = tmp_path / "records.uccidx"
+    index.save(str(path))
+
+    class DiskFull:
+        def __len__(self):
+            return 1
+
+        def tofile(self, f):
+            raise OSError("No space left on device")
+
+    index.postings["zzz"] = (DiskFull(), DiskFull())
+    with pytest.raises(OSError):
+        index.save(str(path))
+
+    assert len(search.LocalIndex.load(str(path))) == 4
+    assert [p.name for p in tmp_path.iterdir()] == ["records.uccidx"]
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "bogus.uccidx"
+    with gzip.open(path, "wb") as f:
+        f.write(b'{"format": "something-else"}\n')
+    with pytest.raises(ValueError):
+        search.LocalIndex.load(str(path))
+
+
+def test_index_from_snapshot(tmp_path):
+    details = _copy_escape(json.dumps({"keywords": ["biochar", "soil"]}).encode())
+    writer = SnapshotWriter(str(tmp_path / "prod.uccsnap"))
+    columns = ["id", "title", "abstract", "details", "category", "is_deleted", "updated_at"]
+    rows = (
+        b"a1\tCompost reactor\t\\N\t" + details + b"\tpatent\tf\t2026-03-01\n"
+        b"a2\tDeleted invention\t\\N\t{}\tpatent\tt\t2026-03-02\n"
+    )
+    legacy = (
+        b"l1\tCompost sifter\t\\N\t{}\tdesign\tf\t2026-03-03\n"
+        b"l2\tDeleted compost bin\t\\N\t{}\tdesign\tt\t2026-03-04\n"
+    )
+    writer.set_columns("ip_records", columns)
+    writer.add_chunk("ip_records", 0, gzip.compress(rows), 2)
+    writer.set_columns("legacy_ip_records", columns)
+    writer.add_chunk("legacy_ip_records", 0, gzip.compress(legacy), 2)
+    writer.close()
+
+    index = search.index_from_snapshot(str(tmp_path / "prod.uccsnap"))
+    assert len(index) == 2
+    assert index.search("biochar").hits[0].id == "a1"
+    assert [hit.id for hit in index.search("compost").hits if hit.source == "legacy_ip_records"] == ["l1"]
+    assert index.search("deleted").total == 0
+    assert index.watermarks == {"ip_records": "2026-03-01", "legacy_ip_records": "2026-03-03"}
+
+
+def test_database_queries_skip_soft_deleted_rows():
+    for source in search.SOURCES:
+        assert "is_deleted = FALSE" in search._SELECT[source]
+        assert "is_deleted = FALSE" in search._LIVE_IDS[source]
+
+
+def test_local_query_command(index, tmp_path, capsys):
+    path = tmp_path / "records.uccidx"
+    index.save(str(path))
+    assert cli.main(["search", "query", "solar dryer", "--local", str(path)]) == 0
+    out = capsys.readouterr().out
+    assert "2 matches" in out and "[legacy]" in out
+
+
+def test_synthetic_benchmark_inputs_are_reproducible():
+    first = [doc["title"] for doc in search.synthetic_documents(5)]
+    assert first == [doc["title"] for doc in search.synthetic_documents(5)]
+    assert search.benchmark_queries(10) == search.benchmark_queries(10)
+
+
+def test_update_from_snapshot_only_applies_changed_rows(tmp_path, capsys):
+    columns = ["id", "title", "abstract", "details", "category", "is_deleted", "updated_at"]
+
+    def archive(name, rows):
+        writer = SnapshotWriter(str(tmp_path / name))
+        writer.set_columns("ip_records", columns)
+        writer.add_chunk("ip_records", 0, gzip.compress(rows), rows.count(b"\n"))
+        writer.close()
+        return str(tmp_path / name)
+
+    first = archive("first.uccsnap", (
+        b"a1\tCompost reactor\t\\N\t{}\tpatent\tf\t2026-03-01\n"
+        b"a2\tSolar kiln\t\\N\t{}\tpatent\tf\t2026-03-02\n"
+    ))
+    second = archive("second.uccsnap", (
+        b"a1\tCompost reactor\t\\N\t{}\tpatent\tf\t2026-03-01\n"
+        b"a3\tRain sensor\t\\N\t{}\tpatent\tf\t2026-03-05\n"
+    ))
+    path = str(tmp_path / "records.uccidx")
+
+    assert cli.main(["search", "build", path, "--from-snapshot", first]) == 0
+    assert cli.main(["search", "update", path, "--from-snapshot", second]) == 0
+    assert "1 records indexed, 1 removed" in capsys.readouterr().out
+
+    index = search.LocalIndex.load(path)
+    assert index.ids("ip_records") == {"a1", "a3"}
+    assert index.watermarks == {"ip_records": "2026-03-05"}
+
+
+def test_update_from_partial_snapshot_keeps_missing_sources(tmp_path, capsys):
+    columns = ["id", "title", "abstract", "details", "category", "is_deleted", "updated_at"]
+    rows = b"a1\tCompost reactor\t\\N\t{}\tpatent\tf\t2026-03-01\n"
+    legacy = (
+        b"l1\tCompost sifter\t\\N\t{}\tdesign\tf\t2026-03-03\n"
+        b"l2\tSolar kiln\t\\N\t{}\tdesign\tf\t2026-03-04\n"
+    )
+
+    full = SnapshotWriter(str(tmp_path / "full.uccsnap"))
+    full.set_columns("ip_records", columns)
+    full.add_chunk("ip_records", 0, gzip.compress(rows), 1)
+    full.set_columns("legacy_ip_records", columns)
+    full.add_chunk("legacy_ip_records", 0, gzip.compress(legacy), 2)
+    full.close()
+
+    # What `ucc-ipo snapshot dump --table ip_records` produces
+    partial = SnapshotWriter(str(tmp_path / "partial.uccsnap"))
+    partial.set_columns("ip_records", columns)
+    partial.add_chunk("ip_records", 0, gzip.compress(b"a2\tRain sensor\t\\N\t{}\tpatent\tf\t2026-03-05\n"), 1)
+    partial.close()
+
+    path = str(tmp_path / "records.uccidx")
+    assert cli.main(["search", "build", path, "--from-snapshot", str(tmp_path / "full.uccsnap")]) == 0
+    assert cli.main(["search", "update", path, "--from-snapshot", str(tmp_path / "partial.uccsnap")]) == 0
+    out = capsys.readouterr().out
+    assert "has no legacy_ip_records table" in out
+    assert "1 records indexed, 1 removed" in out
+
+    index = search.LocalIndex.load(path)
+    assert index.ids("ip_records") == {"a2"}
+    assert index.ids("legacy_ip_records") == {"l1", "l2"}
+    assert index.watermarks["legacy_ip_records"] == "2026-03-04"
+
+
+def test_build_warns_about_missing_sources(tmp_path, capsys):
+    writer = SnapshotWriter(str(tmp_path / "cms.uccsnap"))
+    writer.set_columns("cms_pages", ["id", "slug"])
+    writer.close()
+
+    assert cli.main(["search", "build", str(tmp_path / "records.uccidx"),
+                     "--from-snapshot", str(tmp_path / "cms.uccsnap")]) == 0
+    out = capsys.readouterr().out
+    assert "has no ip_records table" in out
+    assert "has no legacy_ip_records table" in out
+
+
+def test_database_total_survives_pages_past_the_end(index, monkeypatch):
+    hits = [("1", "ip_records", "Solar powered rice dryer", "patent", 0.5, 4),
+            ("4", "legacy_ip_records", "Solar dryer (1998)", "patent", 0.4, 4),
+            ("2", "ip_records", "Water filtration system", "patent", 0.2, 4),
+            ("3", "ip_records", "Mobile tutoring app", "patent", 0.1, 4)]
+
+    class FakeConnection:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            pass
+
+        def execute(self, statement, params):
+            _, limit, offset, _ = params
+            rows = hits[offset:offset + limit]
+            return type("Result", (), {"fetchall": lambda self: rows})()
+
+    class FakePsycopg:
+        @staticmethod
+        def connect(dsn):
+            return FakeConnection()
+
+    monkeypatch.setattr(search, "_import_psycopg", lambda: (FakePsycopg, None))
+    page = search.search_db("postgresql://staging", "solar", page=5, per_page=2)
+    assert (page.hits, page.total) == ([], 4)
+    assert page.total == index.search("solar", page=5, per_page=2).total
@@ -0,0 +1,266 @@
+"""Archive format, chunking and scrubbing checks for ucc-ipo snapshot"""
+
+import contextlib
+import gzip
+import io
+import json
+import tarfile
+
+import pytest
+
+from ucc_ipo import cli, snapshot
+
+
+def _write_archive(path, tables):
+    writer = snapshot.SnapshotWriter(str(path))
+    for table, (columns, data) in tables.items():
+        writer.set_columns(table, columns)
+        for index, chunk in enumerate(snapshot.iter_chunks([data], chunk_size=16)):
+            writer.add_chunk(table, index, gzip.compress(chunk), chunk.count(b"\n"))
+    return writer.close(scrubbed=False)
+
+
+def _tamper(path, tampered):
+    """Rebuild an archive with tampered chunks but the original manifest"""
+    with tarfile.open(path) as src, tarfile.open(tampered, "w") as dst:
+        for member in src.getmembers():
+            payload = src.extractfile(member).read()
+            if member.name.endswith(".copy.gz"):
+                payload = gzip.compress(b"1\tNursing\n")
+                member.size = len(payload)
+            dst.addfile(member, io.BytesIO(payload))
+    return tampered
+
+
+def test_restore_levels_follow_foreign_keys():
+    levels = snapshot.restore_levels(snapshot.TABLES)
+    position = {table: n for n, level in enumerate(levels) for table in level}
+    assert set(position) == set(snapshot.TABLES)
+    for table, depends_on in snapshot.TABLES.items():
+        for parent in depends_on:
+            assert position[parent] < position[table]
+
+
+def test_restore_levels_ignore_tables_outside_the_archive():
+    assert snapshot.restore_levels(["cms_sections", "ip_records"]) == [["cms_sections", "ip_records"]]
+
+
+def test_iter_chunks_splits_on_row_boundaries():
+    rows = [f"{i}\tvalue {i}\n".encode() for i in range(100)]
+    blocks = [b"".join(rows)[i:i + 7] for i in range(0, len(b"".join(rows)), 7)]
+    chunks = list(snapshot.iter_chunks(blocks, chunk_size=64))
+    assert len(chunks) > 1
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    assert b"".join(chunks) == b"".join(rows)
+
+
+def test_archive_round_trip(tmp_path):
+    path = tmp_path / "test.uccsnap"
+    data = b"".join(f"id-{i}\tPage {i}\n".encode() for i in range(20))
+    manifest = _write_archive(path, {"cms_pages": (["id", "title"], data)})
+
+    reader = snapshot.SnapshotReader(str(path))
+    try:
+        entry = reader.tables["cms_pages"]
+        assert entry["columns"] == ["id", "title"]
+        assert entry["rows"] == 20
+        assert reader.verify() == len(entry["chunks"]) > 1
+        restored = b"".join(gzip.decompress(reader.read_chunk(c)) for c in entry["chunks"])
+    finally:
+        reader.close()
+    assert restored == data
+    assert manifest["format"] == snapshot.FORMAT_NAME
+
+
+def test_corrupted_chunk_is_rejected(tmp_path):
+    path = tmp_path / "test.uccsnap"
+    _write_archive(path, {"departments": (["id", "name"], b"1\tEngineering\n")})
+
+    tampered = _tamper(path, tmp_path / "tampered.uccsnap")
+    reader = snapshot.SnapshotReader(str(tampered))
+    try:
+        with pytest.raises(ValueError, match="Checksum mismatch"):
+            reader.verify()
+    finally:
+        reader.close()
+
+    assert cli.main(["--dry-run", "snapshot", "restore", str(tampered)]) == 1
+    assert cli.main(["--dry-run", "snapshot", "restore", str(path)]) == 0
+
+
+def test_scrubber_pseudonymises_users_consistently():
+    scrub = snapshot.Scrubber(salt=b"fixed")
+    columns = ["id", "auth_user_id", "email", "full_name", "verification_token"]
+    data = (
+        b"1\tauth-1\tjuan@ucc.edu.ph\tJuan Cruz\ttoken\n"
+        b"2\t\\N\tJUAN@ucc.edu.ph\t\\N\t\\N\n"
+    )
+    first, second = [row.split(b"\t") for row in scrub("users", columns, data).splitlines()]
+    assert first[1] == b"\\N" and first[4] == b"\\N"
+    assert first[2].endswith(b"@example.invalid") and first[2] == second[2]
+    assert first[3].startswith(b"User ") and second[3] == b"\\N"
+    assert b"juan" not in scrub("users", columns, data).lower()
+
+
+def test_scrubber_clears_names_in_record_details():
+    scrub = snapshot.Scrubber(salt=b"fixed")
+    details = {
+        "inventors": [{"name": "Maria\tSantos"}],
+        "keywords": ["solar"],
+        "creator_name": "Maria",
+        "creator_email": "maria@ucc.edu.ph",
+    }
+    escaped = snapshot._copy_escape(json.dumps(details).encode())
+    out = scrub("legacy_ip_records", ["id", "details"], b"1\t" + escaped + b"\n")
+    result = json.loads(snapshot._copy_unescape(out.rstrip(b"\n").split(b"\t", 1)[1]))
+    assert result == {"inventors": [], "keywords": ["solar"], "creator_name": "", "creator_email": ""}
+
+
+@pytest.mark.parametrize("table", ["departments", "cms_pages"])
+def test_scrubber_nulls_auth_user_references(table):
+    out = snapshot.Scrubber()(table, ["id", "created_by"], b"1\tauth-user-id\n")
+    assert out == b"1\t\\N\n"
+
+
+def test_scrubber_leaves_other_tables_untouched():
+    data = b"1\thero\t{}\n"
+    assert snapshot.Scrubber()("cms_sections", ["id", "section_type", "content"], data) is data
+
+
+def test_unknown_table_is_rejected(capsys):
+    assert cli.main(["--dry-run", "snapshot", "dump", "out.uccsnap", "--table", "auth.users"]) == 1
+    assert "Unknown table" in capsys.readouterr().out
+
+
+def test_failed_dump_keeps_previous_archive(tmp_path, monkeypatch):
+    path = tmp_path / "prod.uccsnap"
+    _write_archive(path, {"departments": (["id", "name"], b"1\tEngineering\n")})
+    before = path.read_bytes()
+
+    class Unreachable:
+        @staticmethod
+        def connect(*args, **kwargs):
+            raise OSError("connection refused")
+
+    monkeypatch.setattr(snapshot, "_import_psycopg", lambda: (Unreachable, None))
+    with pytest.raises(OSError):
+        snapshot.dump("postgresql://unreachable", str(path))
+
+    assert path.read_bytes() == before
+    assert [p.name for p in tmp_path.iterdir()] == ["prod.uccsnap"]
+
+
+class _FakeSQL:
+    """Just enough of psycopg.sql to render statements as strings"""
+
+    class SQL(str):
+        def format(self, *args):
+            return _FakeSQL.SQL(str.format(self, *args))
+
+        def join(self, parts):
+            return _FakeSQL.SQL(str.join(self, parts))
+
+    @staticmethod
+    def Identifier(*parts):
+        return ".".join(f'"{p}"' for p in parts)
+
+
+class _FakeConnection:
+    def __init__(self, log):
+        self.log = log
+
+    def execute(self, statement, *args):
+        self.log.append(str(statement))
+
+    def transaction(self):
+        raise OSError("copy failed")
+
+    def close(self):
+        pass
+
+
+def test_restore_disables_user_triggers_and_reenables_on_failure(tmp_path, monkeypatch):
+    path = tmp_path / "prod.uccsnap"
+    _write_archive(path, {"process_tracking": (["id"], b"1\n")})
+    log = []
+
+    class FakePsycopg:
+        @staticmethod
+        def connect(*args, **kwargs):
+            return _FakeConnection(log)
+
+    monkeypatch.setattr(snapshot, "_import_psycopg", lambda: (FakePsycopg, _FakeSQL))
+    with pytest.raises(OSError):
+        snapshot.restore("postgresql://staging", str(path))
+
+    assert log == [
+        'ALTER TABLE "public"."process_tracking" DISABLE TRIGGER USER',
+        'ALTER TABLE "public"."process_tracking" ENABLE TRIGGER USER',
+    ]
+
+
+def test_restore_verifies_archive_before_truncating(tmp_path, monkeypatch):
+    path = tmp_path / "prod.uccsnap"
+    _write_archive(path, {
+        "departments": (["id", "name"], b"1\tEngineering\n"),
+        "process_tracking": (["id"], b"1\n"),
+    })
+    tampered = _tamper(path, tmp_path / "tampered.uccsnap")
+    log = []
+
+    class FakePsycopg:
+        @staticmethod
+        def connect(*args, **kwargs):
+            return _FakeConnection(log)
+
+    monkeypatch.setattr(snapshot, "_import_psycopg", lambda: (FakePsycopg, _FakeSQL))
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        snapshot.restore("postgresql://staging", str(tampered), truncate=True)
+
+    assert not any(statement.startswith("TRUNCATE") for statement in log)
+    assert log == []
+
+
+class _LoadingConnection(_FakeConnection):
+    """A connection whose COPY FROM STDIN succeeds"""
+
+    def transaction(self):
+        return contextlib.nullcontext()
+
+    def cursor(self):
+        return contextlib.nullcontext(self)
+
+    def copy(self, statement):
+        return contextlib.nullcontext(io.BytesIO())
+
+
+def test_restore_opens_at_most_jobs_connections(tmp_path, monkeypatch):
+    path = tmp_path / "prod.uccsnap"
+    rows = b"".join(b"%d\n" % n for n in range(40))
+    _write_archive(path, {
+        "departments": (["id"], rows),
+        "users": (["id"], rows),
+        "ip_records": (["id"], rows),
+        "process_tracking": (["id"], rows),
+    })
+    assert len(snapshot.restore_levels(["departments", "users", "ip_records", "process_tracking"])) == 4
+    opened = []
+
+    class FakePsycopg:
+        @staticmethod
+        def connect(*args, **kwargs):
+            opened.append(_LoadingConnection([]))
+            return opened[-1]
+
+    monkeypatch.setattr(snapshot, "_import_psycopg", lambda: (FakePsycopg, _FakeSQL))
+    loaded = snapshot.restore("postgresql://staging", str(path), jobs=4)
+
+    assert loaded["process_tracking"] == 40
+    assert len(opened) <= 4 + 1
+
+
+def test_restore_trigger_flags_are_exclusive():
+    parser = cli.build_parser()
+    assert not parser.parse_args(["snapshot", "restore", "a.uccsnap"]).keep_triggers
+    with pytest.raises(SystemExit):
+        parser.parse_args(["snapshot", "restore", "a.uccsnap", "--keep-triggers", "--skip-fk-checks"])
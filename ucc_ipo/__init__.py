@@ -0,0 +1,9 @@
+"""
+UCC IPO maintenance tooling
+Seeding, SQL generation and probe utilities behind the ``ucc-ipo`` command.
+
+Submodules are imported on demand by ``ucc_ipo.cli`` so that the command
+starts quickly and ``--dry-run`` never pulls in network libraries.
+"""
+
+__version__ = "0.1.0"
@@ -0,0 +1,8 @@
+"""Allow ``python -m ucc_ipo`` as an alias for the ``ucc-ipo`` command."""
+
+import sys
+
+from ucc_ipo.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
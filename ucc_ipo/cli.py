@@ -0,0 +1,172 @@
+"""
+ucc-ipo command line entry point
+
+Usage:
+    ucc-ipo [--dry-run] seed [--image PATH] [--slug SLUG]
+    ucc-ipo [--dry-run] sql
+    ucc-ipo [--dry-run] probe [--url URL]
+    ucc-ipo [--dry-run] snapshot {dump,restore} ARCHIVE [--dsn DSN] [--jobs N] [--scrub]
+    ucc-ipo [--dry-run] search {query,build,update,bench} ...
+
+Only the standard library is imported here. Each subcommand lives in its own
+module and is imported when it is dispatched, so ``--help`` and ``--dry-run``
+stay fast and never load supabase, requests, python-dotenv or psycopg.
+"""
+
+import argparse
+import importlib
+import sys
+
+# name -> (module implementing ``run(args)``, help text)
+COMMANDS = {
+    "seed": ("ucc_ipo.seed", "Create the CMS demo page and upload its sample image"),
+    "sql": ("ucc_ipo.sql", "Print the SQL that sets up the CMS demo page"),
+    "probe": ("ucc_ipo.probe", "Call the register-user edge function and show the response"),
+    "snapshot": ("ucc_ipo.snapshot", "Dump or restore CMS and IP tables as a snapshot archive"),
+    "search": ("ucc_ipo.search", "Full-text search over IP record titles, keywords and abstracts"),
+}
+
+# Mirrors ucc_ipo.snapshot.DEFAULT_JOBS / DEFAULT_CHUNK_SIZE without importing it
+SNAPSHOT_DEFAULT_JOBS = 4
+SNAPSHOT_DEFAULT_CHUNK_MIB = 4
+
+# Mirrors ucc_ipo.search.DEFAULT_PER_PAGE without importing it
+SEARCH_DEFAULT_PER_PAGE = 20
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser without importing any subcommand module"""
+    parser = argparse.ArgumentParser(
+        prog="ucc-ipo",
+        description="UCC IPO maintenance tooling",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show what would be done without touching the network",
+    )
+    # Also accept --dry-run after the subcommand name; SUPPRESS keeps the
+    # subparser from resetting a flag given before it.
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--dry-run",
+        action="store_true",
+        default=argparse.SUPPRESS,
+        help="Show what would be done without touching the network",
+    )
+
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    subparsers.required = True
+
+    seed = subparsers.add_parser("seed", parents=[common], help=COMMANDS["seed"][1])
+    seed.add_argument(
+        "--image",
+        help="Sample image to upload (default: $UCC_IPO_DEMO_IMAGE)",
+    )
+    seed.add_argument("--slug", default="demo", help="Page slug (default: demo)")
+
+    subparsers.add_parser("sql", parents=[common], help=COMMANDS["sql"][1])
+
+    probe = subparsers.add_parser("probe", parents=[common], help=COMMANDS["probe"][1])
+    probe.add_argument(
+        "--url",
+        help="Supabase project URL (default: $VITE_SUPABASE_URL)",
+    )
+
+    snapshot = subparsers.add_parser("snapshot", parents=[common], help=COMMANDS["snapshot"][1])
+    actions = snapshot.add_subparsers(dest="action", metavar="ACTION")
+    actions.required = True
+
+    db = argparse.ArgumentParser(add_help=False, parents=[common])
+    db.add_argument("archive", help="Snapshot archive path")
+    db.add_argument("--dsn", help="Postgres URL (default: $SUPABASE_DB_URL or $DATABASE_URL)")
+    db.add_argument(
+        "--jobs",
+        type=int,
+        default=SNAPSHOT_DEFAULT_JOBS,
+        help=f"Parallel connections (default: {SNAPSHOT_DEFAULT_JOBS})",
+    )
+    db.add_argument("--scrub", action="store_true", help="Replace personal data while streaming")
+
+    dump = actions.add_parser("dump", parents=[db], help="Write tables to a snapshot archive")
+    dump.add_argument(
+        "--table",
+        action="append",
+        help="Only dump this table (repeatable; default: all snapshot tables)",
+    )
+    dump.add_argument(
+        "--chunk-size",
+        type=int,
+        default=SNAPSHOT_DEFAULT_CHUNK_MIB,
+        help=f"Uncompressed chunk size in MiB (default: {SNAPSHOT_DEFAULT_CHUNK_MIB})",
+    )
+
+    restore = actions.add_parser("restore", parents=[db], help="Load a snapshot archive")
+    restore.add_argument(
+        "--truncate",
+        action="store_true",
+        help="TRUNCATE ... CASCADE the snapshot tables before loading",
+    )
+    triggers = restore.add_mutually_exclusive_group()
+    triggers.add_argument(
+        "--keep-triggers",
+        action="store_true",
+        help="Let user triggers fire while loading (default: disabled, then re-enabled)",
+    )
+    triggers.add_argument(
+        "--skip-fk-checks",
+        action="store_true",
+        help="Load with session_replication_role = replica (skips FK checks and triggers)",
+    )
+
+    search = subparsers.add_parser("search", parents=[common], help=COMMANDS["search"][1])
+    search_actions = search.add_subparsers(dest="action", metavar="ACTION")
+    search_actions.required = True
+
+    dsn = argparse.ArgumentParser(add_help=False, parents=[common])
+    dsn.add_argument("--dsn", help="Postgres URL (default: $SUPABASE_DB_URL or $DATABASE_URL)")
+
+    query = search_actions.add_parser("query", parents=[dsn], help="Run a ranked search")
+    query.add_argument("text", help='Search terms; Postgres also accepts "phrases", OR and -term')
+    query.add_argument("--local", metavar="INDEX", help="Search a local index file instead of Postgres")
+    query.add_argument("--page", type=int, default=1, help="Result page, starting at 1")
+    query.add_argument(
+        "--per-page",
+        type=int,
+        default=SEARCH_DEFAULT_PER_PAGE,
+        help=f"Results per page (default: {SEARCH_DEFAULT_PER_PAGE}, max 100)",
+    )
+    query.add_argument("--no-legacy", action="store_true", help="Leave out legacy_ip_records")
+
+    for action, help_text in (
+        ("build", "Build a local search index from scratch"),
+        ("update", "Re-index records changed since the last build/update"),
+    ):
+        index = search_actions.add_parser(action, parents=[dsn], help=help_text)
+        index.add_argument("index", help="Local index file")
+        index.add_argument("--from-snapshot", metavar="ARCHIVE", help="Read records from a snapshot archive")
+
+    bench = search_actions.add_parser("bench", parents=[dsn], help="Measure query latency on synthetic records")
+    bench.add_argument(
+        "--records",
+        type=int,
+        nargs="+",
+        default=[100000, 1000000],
+        help="Corpus sizes (default: 100000 1000000)",
+    )
+    bench.add_argument("--queries", type=int, default=200, help="Queries per corpus size (default: 200)")
+
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    module_name, _ = COMMANDS[args.command]
+    module = importlib.import_module(module_name)
+    return module.run(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
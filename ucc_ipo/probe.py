@@ -0,0 +1,86 @@
+"""
+register-user edge function probe
+Sends the same payload as the registration form and prints the raw response
+
+Usage:
+    ucc-ipo probe [--url https://<project>.supabase.co]
+    ucc-ipo --dry-run probe
+
+Requirements (not needed for --dry-run):
+    - requests
+"""
+
+import json
+import os
+from datetime import datetime
+
+DEFAULT_SUPABASE_URL = "https://mgiitubvalwemtxpagps.supabase.co"
+
+
+def build_payload() -> dict:
+    """Test data - exactly what the form sends"""
+    return {
+        "email": f"test-{datetime.now().timestamp()}@example.com",
+        "fullName": "Test User",
+        "password": "TestPassword123",
+        "departmentId": "test-dept-id"
+    }
+
+
+def run(args) -> int:
+    """Entry point for ``ucc-ipo probe``"""
+    supabase_url = args.url or os.getenv("VITE_SUPABASE_URL", DEFAULT_SUPABASE_URL)
+    supabase_key = os.getenv("VITE_SUPABASE_ANON_KEY", "")
+
+    # Function endpoint
+    function_url = f"{supabase_url}/functions/v1/register-user"
+    test_data = build_payload()
+
+    print(f"Testing edge function registration...")
+    print(f"Function URL: {function_url}")
+    print(f"Test data: {json.dumps(test_data, indent=2)}")
+    print("-" * 80)
+
+    if args.dry_run:
+        print("🧪 Dry run - request not sent")
+        return 0
+
+    try:
+        import requests
+    except ImportError:
+        print("❌ requests not installed. Install it with: pip install requests")
+        return 1
+
+    try:
+        response = requests.post(
+            function_url,
+            json=test_data,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {supabase_key}" if supabase_key else ""
+            },
+            timeout=30
+        )
+
+        print(f"Status Code: {response.status_code}")
+        print(f"Response Headers: {dict(response.headers)}")
+        print(f"Response Body: {response.text}")
+
+        if response.status_code == 200:
+            print("\n✅ SUCCESS!")
+            return 0
+
+        print(f"\n❌ ERROR: Got {response.status_code}")
+        return 1
+
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
+        print(f"Error type: {type(e).__name__}")
+        return 1
+
+
+def main(argv=None) -> int:
+    import sys
+
+    from ucc_ipo.cli import main as cli_main
+    return cli_main(["probe", *(sys.argv[1:] if argv is None else argv)])
@@ -0,0 +1,621 @@
+"""
+IP record full-text search
+Ranked search over ip_records and legacy_ip_records titles, keywords and
+abstracts, either through Postgres or through a local BM25 index
+
+Usage:
+    ucc-ipo search query "solar dryer" [--page 2] [--per-page 20]
+    ucc-ipo search query "solar dryer" --local records.uccidx
+    ucc-ipo search build records.uccidx [--from-snapshot prod.uccsnap]
+    ucc-ipo search update records.uccidx
+    ucc-ipo search bench --records 100000 1000000 [--dsn ...]
+
+Postgres keeps the weighted document current itself through expression GIN
+indexes on ``ip_search_document(title, abstract, details)`` (see the
+20260320000001_add_ip_records_full_text_search migration); queries go through
+``search_ip_records()`` so RLS and soft deletes still apply. Its indexed match
+runs in the SECURITY DEFINER ``ip_search_matches()``, because RLS keeps the
+non-leakproof ``@@`` from using the index in an invoker query.
+
+The local index is for offline use (air-gapped review, staging snapshots). It
+uses the same field weights as ip_search_document() (title > keywords >
+abstract) and the same AND semantics, scored with BM25. ``update`` re-reads
+only rows whose updated_at is past the stored watermark, plus the id lists
+needed to drop deleted records.
+
+Requirements (only for Postgres queries, build/update from a database and
+bench --dsn):
+    - psycopg >= 3.1
+"""
+
+import gzip
+import heapq
+import json
+import math
+import os
+import re
+import tempfile
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter, namedtuple
+
+INDEX_FORMAT = "ucc-ipo-search"
+INDEX_VERSION = 1
+
+SOURCES = ("ip_records", "legacy_ip_records")
+
+# Mirrors the A/B/C setweight() labels in ip_search_document()
+FIELD_WEIGHTS = {"title": 3.0, "keywords": 2.0, "abstract": 1.0}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in into is it its of on or
+that the their this to was were which with
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+Hit = namedtuple("Hit", "id source title category score")
+SearchPage = namedtuple("SearchPage", "hits total page per_page")
+
+
+def tokenize(text: str) -> list:
+    """Lowercase words with stopwords removed and plural -s stripped"""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _keywords(details) -> str:
+    if isinstance(details, str):
+        try:
+            details = json.loads(details)
+        except ValueError:
+            return ""
+    if not isinstance(details, dict) or not isinstance(details.get("keywords"), list):
+        return ""
+    return " ".join(str(k) for k in details["keywords"])
+
+
+def document_from_row(source: str, row: dict) -> dict:
+    """Build an index document from an ip_records / legacy_ip_records row"""
+    return {
+        "id": str(row["id"]),
+        "source": source,
+        "title": row.get("title") or "",
+        "abstract": row.get("abstract") or "",
+        "keywords": _keywords(row.get("details")),
+        "category": str(row.get("category") or ""),
+        "updated_at": str(row.get("updated_at") or ""),
+    }
+
+
+def _offset(page: int, per_page: int):
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    page = max(1, page)
+    return page, per_page, (page - 1) * per_page
+
+
+class LocalIndex:
+    """In-memory BM25 inverted index over IP record documents
+
+    Postings are compact ``array`` pairs (document number, weighted term
+    frequency), kept sorted by document number. Removing a document only
+    marks it dead; ``compact()`` (run by ``save()``) rewrites the postings
+    without the dead entries.
+    """
+
+    def __init__(self):
+        self.keys = []          # docno -> (source, id)
+        self.meta = []          # docno -> (title, category, updated_at)
+        self.lengths = array("f")
+        self.live = bytearray()
+        self.lookup = {}        # (source, id) -> docno
+        self.postings = {}      # term -> (array("I") docnos, array("f") tfs)
+        self.total_length = 0.0
+        self.watermarks = {}    # source -> max updated_at indexed
+
+    def __len__(self) -> int:
+        return len(self.lookup)
+
+    def add(self, doc: dict):
+        """Add or replace a document"""
+        key = (doc["source"], doc["id"])
+        if key in self.lookup:
+            self.remove(*key)
+
+        frequencies = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(doc.get(field) or ""):
+                frequencies[token] += weight
+        length = sum(frequencies.values())
+
+        docno = len(self.keys)
+        self.keys.append(key)
+        self.meta.append((doc.get("title", ""), doc.get("category", ""), doc.get("updated_at", "")))
+        self.lengths.append(length)
+        self.live.append(1)
+        self.lookup[key] = docno
+        self.total_length += length
+        for term, tf in frequencies.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = (array("I"), array("f"))
+            posting[0].append(docno)
+            posting[1].append(tf)
+
+        updated_at = doc.get("updated_at") or ""
+        if updated_at > self.watermarks.get(doc["source"], ""):
+            self.watermarks[doc["source"]] = updated_at
+
+    def remove(self, source: str, record_id: str) -> bool:
+        docno = self.lookup.pop((source, record_id), None)
+        if docno is None:
+            return False
+        self.live[docno] = 0
+        self.total_length -= self.lengths[docno]
+        return True
+
+    def ids(self, source: str) -> set:
+        return {record_id for s, record_id in self.lookup if s == source}
+
+    def search(self, query: str, page: int = 1, per_page: int = DEFAULT_PER_PAGE,
+               include_legacy: bool = True) -> SearchPage:
+        """Return one page of documents containing every query term, best first"""
+        page, per_page, offset = _offset(page, per_page)
+        terms = list(dict.fromkeys(tokenize(query)))
+        count = len(self.lookup)
+        if not terms or not count:
+            return SearchPage([], 0, page, per_page)
+
+        postings = []
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                return SearchPage([], 0, page, per_page)
+            postings.append(posting)
+        postings.sort(key=lambda p: len(p[0]))
+
+        live = self.live
+        lengths = self.lengths
+        average = self.total_length / count
+        tombstones = len(self.keys) != count
+
+        def weight(docnos):
+            df = sum(live[d] for d in docnos) if tombstones else len(docnos)
+            return math.log(1 + (count - df + 0.5) / (df + 0.5))
+
+        def bm25(idf, tf, d):
+            return idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths[d] / average))
+
+        # Score the rarest term, then intersect; postings are sorted by docno,
+        # so a small candidate set is probed with bisect instead of a scan
+        docnos, tfs = postings[0]
+        idf = weight(docnos)
+        scores = {d: bm25(idf, tf, d) for d, tf in zip(docnos, tfs) if live[d]}
+        for docnos, tfs in postings[1:]:
+            if not scores:
+                break
+            idf = weight(docnos)
+            matched = {}
+            if len(scores) * 16 < len(docnos):
+                for d, score in scores.items():
+                    i = bisect_left(docnos, d)
+                    if i < len(docnos) and docnos[i] == d:
+                        matched[d] = score + bm25(idf, tfs[i], d)
+            else:
+                for d, tf in zip(docnos, tfs):
+                    score = scores.get(d)
+                    if score is not None:
+                        matched[d] = score + bm25(idf, tf, d)
+            scores = matched
+
+        if not include_legacy:
+            scores = {d: s for d, s in scores.items() if self.keys[d][0] != "legacy_ip_records"}
+
+        top = heapq.nlargest(offset + per_page, scores.items(), key=lambda item: (item[1], -item[0]))
+        hits = []
+        for d, score in top[offset:]:
+            source, record_id = self.keys[d]
+            title, category, _ = self.meta[d]
+            hits.append(Hit(record_id, source, title, category, score))
+        return SearchPage(hits, len(scores), page, per_page)
+
+    def compact(self):
+        """Drop removed documents and renumber the rest"""
+        if len(self.lookup) == len(self.keys):
+            return
+        renumber = {}
+        keys, meta, lengths = [], [], array("f")
+        for old, alive in enumerate(self.live):
+            if alive:
+                renumber[old] = len(keys)
+                keys.append(self.keys[old])
+                meta.append(self.meta[old])
+                lengths.append(self.lengths[old])
+        postings = {}
+        for term, (docnos, tfs) in self.postings.items():
+            kept = [(renumber[d], tf) for d, tf in zip(docnos, tfs) if d in renumber]
+            if kept:
+                postings[term] = (array("I", (d for d, _ in kept)), array("f", (tf for _, tf in kept)))
+        self.keys, self.meta, self.lengths, self.postings = keys, meta, lengths, postings
+        self.live = bytearray(b"\x01" * len(keys))
+        self.lookup = {key: docno for docno, key in enumerate(keys)}
+        self.total_length = float(sum(lengths))
+
+    def save(self, path: str):
+        """Write the index as a gzip'd JSON header line followed by raw postings"""
+        self.compact()
+        terms = sorted(self.postings)
+        header = {
+            "format": INDEX_FORMAT,
+            "version": INDEX_VERSION,
+            "itemsize": array("I").itemsize,
+            "watermarks": self.watermarks,
+            "keys": self.keys,
+            "meta": self.meta,
+            "terms": terms,
+            "counts": [len(self.postings[t][0]) for t in terms],
+        }
+        # Write next to the target and rename on success, so a crash or full
+        # disk during ``update`` never destroys the previous index
+        fd, partial = tempfile.mkstemp(
+            prefix=f".{os.path.basename(path)}.", suffix=".partial",
+            dir=os.path.dirname(os.path.abspath(path)),
+        )
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                f.write(json.dumps(header, separators=(",", ":")).encode() + b"\n")
+                self.lengths.tofile(f)
+                for term in terms:
+                    docnos, tfs = self.postings[term]
+                    docnos.tofile(f)
+                    tfs.tofile(f)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.unlink(partial)
+
+    @classmethod
+    def load(cls, path: str) -> "LocalIndex":
+        with gzip.open(path, "rb") as f:
+            header = json.loads(f.readline())
+            if header.get("format") != INDEX_FORMAT or header.get("version") != INDEX_VERSION:
+                raise ValueError(f"{path} is not a ucc-ipo search index (v{INDEX_VERSION})")
+            if header["itemsize"] != array("I").itemsize:
+                raise ValueError(f"{path} was written on an incompatible platform")
+
+            index = cls()
+            index.watermarks = header["watermarks"]
+            index.keys = [tuple(key) for key in header["keys"]]
+            index.meta = [tuple(m) for m in header["meta"]]
+            index.lengths.fromfile(f, len(index.keys))
+            for term, count in zip(header["terms"], header["counts"]):
+                docnos, tfs = array("I"), array("f")
+                docnos.fromfile(f, count)
+                tfs.fromfile(f, count)
+                index.postings[term] = (docnos, tfs)
+
+        index.live = bytearray(b"\x01" * len(index.keys))
+        index.lookup = {key: docno for docno, key in enumerate(index.keys)}
+        index.total_length = float(sum(index.lengths))
+        return index
+
+
+# ---------------------------------------------------------------------------
+# Indexer
+# ---------------------------------------------------------------------------
+
+_SELECT = {
+    "ip_records": (
+        "SELECT id, title, abstract, details, category::text AS category, updated_at::text AS updated_at"
+        " FROM ip_records WHERE is_deleted = FALSE"
+    ),
+    "legacy_ip_records": (
+        "SELECT id, title, abstract, details, category, updated_at::text AS updated_at"
+        " FROM legacy_ip_records WHERE is_deleted = FALSE"
+    ),
+}
+
+_LIVE_IDS = {
+    "ip_records": "SELECT id::text FROM ip_records WHERE is_deleted = FALSE",
+    "legacy_ip_records": "SELECT id::text FROM legacy_ip_records WHERE is_deleted = FALSE",
+}
+
+
+def _import_psycopg():
+    try:
+        import psycopg
+        from psycopg.rows import dict_row
+    except ImportError:
+        raise RuntimeError("psycopg not installed. Install it with: pip install 'psycopg>=3.1'")
+    return psycopg, dict_row
+
+
+def index_from_snapshot(path: str) -> LocalIndex:
+    """Build a local index from a ``ucc-ipo snapshot`` archive"""
+    index = LocalIndex()
+    update_from_snapshot(index, path)
+    return index
+
+
+def update_from_snapshot(index: LocalIndex, path: str) -> dict:
+    """Apply snapshot rows past the index watermarks
+
+    Sources the archive does not contain (``snapshot dump --table ...``) are
+    left as they are rather than treated as emptied. Returns
+    {"added": n, "removed": n, "missing": [source, ...]}.
+    """
+    from ucc_ipo.snapshot import SnapshotReader
+
+    added = removed = 0
+    missing = []
+    reader = SnapshotReader(path)
+    try:
+        for source in SOURCES:
+            if source not in reader.tables:
+                missing.append(source)
+                continue
+            watermark = index.watermarks.get(source, "")
+            live = set()
+            for row in reader.iter_rows(source):
+                if row.get("is_deleted") == "t":
+                    continue
+                live.add(row["id"])
+                if (row.get("updated_at") or "") >= watermark:
+                    index.add(document_from_row(source, row))
+                    added += 1
+            for record_id in index.ids(source) - live:
+                index.remove(source, record_id)
+                removed += 1
+    finally:
+        reader.close()
+    return {"added": added, "removed": removed, "missing": missing}
+
+
+def update_from_db(index: LocalIndex, dsn: str, batch_size: int = 5000) -> dict:
+    """Bring a local index up to date; return {"added": n, "removed": n}"""
+    psycopg, dict_row = _import_psycopg()
+    added = removed = 0
+    with psycopg.connect(dsn) as conn:
+        for source in SOURCES:
+            query = _SELECT[source]
+            params = ()
+            watermark = index.watermarks.get(source)
+            if watermark:
+                query += " AND updated_at >= %s::timestamptz"
+                params = (watermark,)
+            with conn.cursor(name=f"search_{source}", row_factory=dict_row) as cur:
+                cur.itersize = batch_size
+                cur.execute(query, params)
+                for row in cur:
+                    index.add(document_from_row(source, row))
+                    added += 1
+
+            live = {row[0] for row in conn.execute(_LIVE_IDS[source])}
+            for record_id in index.ids(source) - live:
+                index.remove(source, record_id)
+                removed += 1
+    return {"added": added, "removed": removed}
+
+
+def search_db(dsn: str, query: str, page: int = 1, per_page: int = DEFAULT_PER_PAGE,
+              include_legacy: bool = True) -> SearchPage:
+    """Run search_ip_records() and return one page of hits"""
+    psycopg, _ = _import_psycopg()
+    page, per_page, offset = _offset(page, per_page)
+    statement = (
+        "SELECT id::text, source, title, category, rank, total_count"
+        " FROM search_ip_records(%s, %s, %s, %s)"
+    )
+    with psycopg.connect(dsn) as conn:
+        rows = conn.execute(statement, (query, per_page, offset, include_legacy)).fetchall()
+        if not rows and offset:
+            # total_count only rides on returned rows; past the last page ask
+            # for the first hit so the total matches LocalIndex.search
+            rows_total = conn.execute(statement, (query, 1, 0, include_legacy)).fetchall()
+        else:
+            rows_total = rows
+    total = rows_total[0][5] if rows_total else 0
+    return SearchPage([Hit(*row[:5]) for row in rows], total, page, per_page)
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def synthetic_documents(count: int, seed: int = 7, vocabulary: int = 30000):
+    """Yield reproducible IP-record-like documents with Zipf-distributed words"""
+    import random
+
+    rng = random.Random(seed)
+    words = [f"t{n:x}" for n in range(vocabulary)]
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, vocabulary + 1):
+        total += 1.0 / rank
+        cum_weights.append(total)
+    categories = ("patent", "copyright", "trademark", "design", "utility_model", "other")
+
+    for n in range(count):
+        sample = rng.choices(words, cum_weights=cum_weights, k=54)
+        yield {
+            "id": f"00000000-0000-0000-0000-{n:012d}",
+            "source": "ip_records",
+            "title": " ".join(sample[:6]),
+            "keywords": " ".join(sample[6:10]),
+            "abstract": " ".join(sample[10:]),
+            "category": categories[n % len(categories)],
+            "updated_at": "2026-01-01 00:00:00+00",
+        }
+
+
+def benchmark_queries(count: int = 200, seed: int = 11, vocabulary: int = 30000) -> list:
+    """One- to three-word queries mixing common and rare terms"""
+    import random
+
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        size = rng.choice((1, 2, 2, 3))
+        ranks = [int(vocabulary ** rng.random()) for _ in range(size)]
+        queries.append(" ".join(f"t{r:x}" for r in ranks))
+    return queries
+
+
+def _percentiles(samples: list) -> dict:
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+def bench_local(count: int, queries: list) -> dict:
+    start = time.perf_counter()
+    index = LocalIndex()
+    for doc in synthetic_documents(count):
+        index.add(doc)
+    build = time.perf_counter() - start
+
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query)
+        samples.append(time.perf_counter() - start)
+    return {"build_s": build, **_percentiles(samples)}
+
+
+def bench_db(dsn: str, count: int, queries: list) -> dict:
+    """Time the indexed match and ranking on a temp table with the same expression index
+
+    This is the path ip_search_matches() takes, as the connecting role and
+    without RLS. search_ip_records() adds a primary-key join per match, where
+    the callers' RLS policies are checked; it is not timed here.
+    """
+    psycopg, _ = _import_psycopg()
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        conn.execute(
+            "CREATE TEMP TABLE search_bench ("
+            " id text PRIMARY KEY, title text, abstract text, details jsonb)"
+        )
+        start = time.perf_counter()
+        with conn.cursor() as cur, cur.copy("COPY search_bench (id, title, abstract, details) FROM STDIN") as copy:
+            for doc in synthetic_documents(count):
+                details = json.dumps({"keywords": doc["keywords"].split()})
+                copy.write_row((doc["id"], doc["title"], doc["abstract"], details))
+        conn.execute("CREATE INDEX ON search_bench USING GIN (public.ip_search_document(title, abstract, details))")
+        conn.execute("ANALYZE search_bench")
+        build = time.perf_counter() - start
+
+        samples = []
+        for query in queries:
+            start = time.perf_counter()
+            conn.execute(
+                "WITH q AS (SELECT websearch_to_tsquery('english', %s) AS query)"
+                " SELECT id, ts_rank_cd(public.ip_search_document(title, abstract, details), q.query) AS rank,"
+                " count(*) OVER ()"
+                " FROM search_bench, q WHERE public.ip_search_document(title, abstract, details) @@ q.query"
+                " ORDER BY rank DESC, id LIMIT %s",
+                (query, DEFAULT_PER_PAGE),
+            ).fetchall()
+            samples.append(time.perf_counter() - start)
+        conn.execute("DROP TABLE search_bench")
+    return {"build_s": build, **_percentiles(samples)}
+
+
+# ---------------------------------------------------------------------------
+# Command
+# ---------------------------------------------------------------------------
+
+def _dsn(args) -> str:
+    return getattr(args, "dsn", None) or os.getenv("SUPABASE_DB_URL") or os.getenv("DATABASE_URL")
+
+
+def _print_page(result: SearchPage):
+    pages = max(1, math.ceil(result.total / result.per_page))
+    print(f"🔎 {result.total} matches (page {result.page} of {pages})")
+    for n, hit in enumerate(result.hits, (result.page - 1) * result.per_page + 1):
+        legacy = " [legacy]" if hit.source == "legacy_ip_records" else ""
+        print(f"  {n:>3}. {hit.title}{legacy}  ({hit.category}, score {hit.score:.3f})  {hit.id}")
+
+
+def run(args) -> int:
+    """Entry point for ``ucc-ipo search``"""
+    if args.action == "query":
+        if args.dry_run and not args.local:
+            print("🧪 Dry run - would call search_ip_records() with:")
+            print(f"   query={args.text!r} page={args.page} per_page={args.per_page} legacy={not args.no_legacy}")
+            return 0
+        try:
+            if args.local:
+                result = LocalIndex.load(args.local).search(args.text, args.page, args.per_page, not args.no_legacy)
+            else:
+                dsn = _dsn(args)
+                if not dsn:
+                    print("❌ No database URL. Pass --dsn, set SUPABASE_DB_URL, or use --local.")
+                    return 1
+                result = search_db(dsn, args.text, args.page, args.per_page, not args.no_legacy)
+        except Exception as e:
+            print(f"❌ Search failed: {e}")
+            return 1
+        _print_page(result)
+        return 0
+
+    if args.action in ("build", "update"):
+        source = args.from_snapshot or "database"
+        if args.dry_run:
+            print(f"🧪 Dry run - would {args.action} {args.index} from {source}")
+            return 0
+        try:
+            dsn = _dsn(args)
+            if not args.from_snapshot and not dsn:
+                print("❌ No database URL. Pass --dsn, set SUPABASE_DB_URL, or use --from-snapshot.")
+                return 1
+            exists = args.action == "update" and os.path.exists(args.index)
+            index = LocalIndex.load(args.index) if exists else LocalIndex()
+            if args.from_snapshot:
+                changes = update_from_snapshot(index, args.from_snapshot)
+            else:
+                changes = update_from_db(index, dsn)
+            for missing in changes.get("missing", ()):
+                print(f"⚠️  {args.from_snapshot} has no {missing} table; left {missing} unchanged")
+            print(f"✅ {changes['added']} records indexed, {changes['removed']} removed")
+            index.save(args.index)
+        except Exception as e:
+            print(f"❌ Index {args.action} failed: {e}")
+            return 1
+        print(f"💾 Saved {len(index)} records to {args.index}")
+        return 0
+
+    # bench
+    queries = benchmark_queries(args.queries)
+    if args.dry_run:
+        target = "Postgres and local index" if args.dsn else "local index"
+        print(f"🧪 Dry run - would benchmark {len(queries)} queries on {target} at {args.records} records")
+        return 0
+    print(f"⏱️  {len(queries)} queries, {DEFAULT_PER_PAGE} hits per page")
+    if args.dsn:
+        print("   postgres: GIN expression-index match on a temp table, no RLS (the ip_search_matches() path)")
+    print(f"{'backend':<10} {'records':>10} {'build s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for count in args.records:
+        backends = [("local", lambda: bench_local(count, queries))]
+        if args.dsn:
+            backends.append(("postgres", lambda: bench_db(args.dsn, count, queries)))
+        for name, bench in backends:
+            try:
+                r = bench()
+            except Exception as e:
+                print(f"❌ {name} benchmark failed at {count} records: {e}")
+                return 1
+            print(f"{name:<10} {count:>10} {r['build_s']:>9.1f} {r['p50']:>8.2f} {r['p95']:>8.2f} {r['p99']:>8.2f}")
+    return 0
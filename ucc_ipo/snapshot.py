@@ -0,0 +1,600 @@
+"""
+CMS and IP data snapshots
+Dumps the CMS, footer, department and IP tables into a single archive and
+restores it into another database (e.g. production -> staging)
+
+Usage:
+    ucc-ipo snapshot dump prod.uccsnap --dsn postgresql://...
+    ucc-ipo snapshot restore prod.uccsnap --dsn postgresql://... --truncate --scrub
+    ucc-ipo --dry-run snapshot restore prod.uccsnap    (verify checksums offline)
+
+The DSN defaults to $SUPABASE_DB_URL or $DATABASE_URL and must be a direct
+(session) connection; the transaction pooler cannot share a dump snapshot.
+
+Archive format (version 1) is an uncompressed tar containing:
+    <table>/<index>.copy.gz   gzip'd COPY text rows, split on row boundaries
+    manifest.json             tables, columns, row counts and sha256 per chunk
+
+Each table is dumped by its own worker inside one exported transaction
+snapshot, so the archive is consistent across tables. Chunks are compressed
+by the workers and appended by a single writer through a bounded queue, so
+memory stays at roughly jobs x chunk size whatever the table sizes. Restore
+loads tables level by level in foreign key order, with every chunk of a
+level copied concurrently, and with user triggers on the snapshot tables
+disabled unless --keep-triggers is given.
+
+Requirements (not needed for --dry-run):
+    - psycopg >= 3.1
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import queue
+import re
+import secrets
+import tarfile
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+FORMAT_NAME = "ucc-ipo-snapshot"
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+DEFAULT_JOBS = 4
+
+# How restore() treats user triggers on the snapshot tables
+TRIGGER_MODES = ("disable", "replica", "keep")
+
+# Snapshot tables and the snapshot tables they reference. References to
+# auth.users are not listed; see --skip-fk-checks and Scrubber.rules.
+TABLES = {
+    "departments": (),
+    "users": ("departments",),
+    "cms_pages": (),
+    "cms_sections": ("cms_pages",),
+    "site_footer_settings": (),
+    "site_footer_links": (),
+    "ip_records": ("users",),
+    "legacy_ip_records": (),
+    "ip_documents": ("ip_records", "users"),
+    "evaluations": ("ip_records", "users"),
+    "supervisor_assignments": ("ip_records", "users"),
+    "evaluator_assignments": ("ip_records", "users"),
+    "process_tracking": ("ip_records", "users"),
+    "activity_logs": ("ip_records", "users"),
+    "certificates": ("ip_records", "users"),
+}
+
+# COPY text format NULL marker
+NULL = b"\\N"
+
+# JSON keys in ip_records.details / legacy_ip_records.details holding names,
+# emails or affiliations of inventors and creators
+PII_DETAIL_KEYS = (
+    "inventors",
+    "collaborators",
+    "coCreators",
+    "creator_name",
+    "creator_email",
+    "creator_affiliation",
+)
+
+
+def restore_levels(tables) -> list:
+    """Group tables into levels; every table only references earlier levels"""
+    remaining = list(tables)
+    loaded = set()
+    levels = []
+    while remaining:
+        level = [t for t in remaining if all(d in loaded or d not in remaining for d in TABLES.get(t, ()))]
+        if not level:
+            raise ValueError(f"Circular table dependencies: {', '.join(remaining)}")
+        levels.append(level)
+        loaded.update(level)
+        remaining = [t for t in remaining if t not in loaded]
+    return levels
+
+
+def iter_chunks(blocks, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Re-split a stream of COPY output blocks into chunks of whole rows"""
+    buffer = bytearray()
+    for block in blocks:
+        buffer += block
+        while len(buffer) >= chunk_size:
+            # Last row ending within the limit, or the end of an oversized row
+            cut = buffer.rfind(b"\n", 0, chunk_size) + 1 or buffer.find(b"\n", chunk_size) + 1
+            if not cut:
+                break
+            yield bytes(buffer[:cut])
+            del buffer[:cut]
+    if buffer:
+        if not buffer.endswith(b"\n"):
+            buffer += b"\n"
+        yield bytes(buffer)
+
+
+# ---------------------------------------------------------------------------
+# PII scrubbing
+# ---------------------------------------------------------------------------
+
+_UNESCAPE = {b"b": b"\b", b"f": b"\f", b"n": b"\n", b"r": b"\r", b"t": b"\t", b"v": b"\v", b"\\": b"\\"}
+_UNESCAPE_RE = re.compile(rb"\\(.)")
+_ESCAPE = {v: b"\\" + k for k, v in _UNESCAPE.items()}
+_ESCAPE_RE = re.compile(rb"[\\\b\f\n\r\t\v]")
+
+
+def _copy_unescape(value: bytes) -> bytes:
+    return _UNESCAPE_RE.sub(lambda m: _UNESCAPE.get(m.group(1), m.group(1)), value)
+
+
+def _copy_escape(value: bytes) -> bytes:
+    return _ESCAPE_RE.sub(lambda m: _ESCAPE[m.group(0)], value)
+
+
+class Scrubber:
+    """Replace personal data in COPY text chunks
+
+    Pseudonyms are derived from a per-run salt, so the same email or name
+    maps to the same value across tables (keeping UNIQUE constraints and
+    joins intact) but cannot be reversed by hashing known addresses.
+    """
+
+    def __init__(self, salt: bytes = None):
+        self.salt = salt if salt is not None else secrets.token_bytes(16)
+        # auth.users is not part of the snapshot, so columns referencing it
+        # are nulled; otherwise they fail FK checks in the target database
+        self.rules = {
+            "departments": {"created_by": self.null},
+            "cms_pages": {"created_by": self.null},
+            "users": {
+                "email": self.email,
+                "full_name": self.name,
+                "verification_token": self.null,
+                "auth_user_id": self.null,
+                "profile_data": lambda value: b"{}",
+            },
+            "ip_records": {"details": self.details},
+            "legacy_ip_records": {"details": self.details},
+            "process_tracking": {"actor_name": self.name},
+            "activity_logs": {"ip_address": self.null},
+            "certificates": {"co_creators": self.null},
+        }
+
+    def token(self, value: bytes) -> str:
+        return hashlib.sha256(self.salt + value).hexdigest()[:12]
+
+    def email(self, value: bytes) -> bytes:
+        return f"user-{self.token(value.lower())}@example.invalid".encode()
+
+    def name(self, value: bytes) -> bytes:
+        return f"User {self.token(value)}".encode()
+
+    def null(self, value: bytes) -> bytes:
+        return NULL
+
+    def details(self, value: bytes) -> bytes:
+        try:
+            details = json.loads(_copy_unescape(value))
+        except ValueError:
+            return b"{}"
+        if not isinstance(details, dict):
+            return value
+        for key in PII_DETAIL_KEYS:
+            if key in details:
+                details[key] = [] if isinstance(details[key], list) else ""
+        return _copy_escape(json.dumps(details, ensure_ascii=False).encode())
+
+    def __call__(self, table: str, columns: list, data: bytes) -> bytes:
+        rules = self.rules.get(table)
+        if not rules:
+            return data
+        positions = [(columns.index(c), rule) for c, rule in rules.items() if c in columns]
+        if not positions:
+            return data
+
+        rows = []
+        for line in data.split(b"\n")[:-1]:
+            fields = line.split(b"\t")
+            for i, rule in positions:
+                if fields[i] != NULL:
+                    fields[i] = rule(fields[i])
+            rows.append(b"\t".join(fields))
+        return b"\n".join(rows) + b"\n"
+
+
+# ---------------------------------------------------------------------------
+# Archive
+# ---------------------------------------------------------------------------
+
+def chunk_name(table: str, index: int) -> str:
+    return f"{table}/{index:06d}.copy.gz"
+
+
+class SnapshotWriter:
+    """Append compressed chunks to a snapshot archive; not thread safe"""
+
+    def __init__(self, path: str):
+        self.tar = tarfile.open(path, "w")
+        self.tables = {}
+
+    def _add(self, name: str, payload: bytes):
+        info = tarfile.TarInfo(name)
+        info.size = len(payload)
+        info.mtime = int(datetime.now(timezone.utc).timestamp())
+        self.tar.addfile(info, io.BytesIO(payload))
+
+    def add_chunk(self, table: str, index: int, payload: bytes, rows: int):
+        name = chunk_name(table, index)
+        self._add(name, payload)
+        entry = self.tables.setdefault(table, {"columns": [], "rows": 0, "chunks": []})
+        entry["rows"] += rows
+        entry["chunks"].append({
+            "name": name,
+            "rows": rows,
+            "sha256": hashlib.sha256(payload).hexdigest(),
+        })
+
+    def set_columns(self, table: str, columns: list):
+        self.tables.setdefault(table, {"columns": [], "rows": 0, "chunks": []})["columns"] = list(columns)
+
+    def close(self, **extra) -> dict:
+        for entry in self.tables.values():
+            entry["chunks"].sort(key=lambda chunk: chunk["name"])
+        manifest = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            **extra,
+            "tables": self.tables,
+        }
+        self._add(MANIFEST_NAME, json.dumps(manifest, indent=2).encode())
+        self.tar.close()
+        return manifest
+
+
+class SnapshotReader:
+    """Read a snapshot archive written by SnapshotWriter"""
+
+    def __init__(self, path: str):
+        self.tar = tarfile.open(path, "r")
+        try:
+            manifest = json.load(self.tar.extractfile(MANIFEST_NAME))
+        except KeyError:
+            self.tar.close()
+            raise ValueError(f"{path} has no {MANIFEST_NAME}; not a snapshot archive")
+        if manifest.get("format") != FORMAT_NAME or manifest.get("version") != FORMAT_VERSION:
+            self.tar.close()
+            raise ValueError(f"{path}: unsupported snapshot format {manifest.get('format')} v{manifest.get('version')}")
+        self.manifest = manifest
+
+    @property
+    def tables(self) -> dict:
+        return self.manifest["tables"]
+
+    def read_chunk(self, chunk: dict) -> bytes:
+        """Return the compressed payload of a chunk after checking its sha256"""
+        payload = self.tar.extractfile(chunk["name"]).read()
+        if hashlib.sha256(payload).hexdigest() != chunk["sha256"]:
+            raise ValueError(f"Checksum mismatch in {chunk['name']}")
+        return payload
+
+    def iter_rows(self, table: str):
+        """Yield each row of a table as a dict of column -> str (None for NULL)"""
+        entry = self.tables.get(table)
+        if entry is None:
+            return
+        columns = entry["columns"]
+        for chunk in entry["chunks"]:
+            data = gzip.decompress(self.read_chunk(chunk))
+            for line in data.split(b"\n")[:-1]:
+                values = [None if v == NULL else _copy_unescape(v).decode() for v in line.split(b"\t")]
+                yield dict(zip(columns, values))
+
+    def verify(self) -> int:
+        """Check every chunk checksum; return the number of chunks checked"""
+        count = 0
+        for entry in self.tables.values():
+            for chunk in entry["chunks"]:
+                self.read_chunk(chunk)
+                count += 1
+        return count
+
+    def close(self):
+        self.tar.close()
+
+
+# ---------------------------------------------------------------------------
+# Database
+# ---------------------------------------------------------------------------
+
+def _import_psycopg():
+    try:
+        import psycopg
+        from psycopg import sql
+    except ImportError:
+        raise RuntimeError("psycopg not installed. Install it with: pip install 'psycopg>=3.1'")
+    return psycopg, sql
+
+
+def _table_columns(conn, table: str) -> list:
+    rows = conn.execute(
+        "SELECT column_name FROM information_schema.columns"
+        " WHERE table_schema = 'public' AND table_name = %s AND is_generated = 'NEVER'"
+        " ORDER BY ordinal_position",
+        (table,),
+    ).fetchall()
+    if not rows:
+        raise RuntimeError(f"Table public.{table} not found")
+    return [row[0] for row in rows]
+
+
+def _copy_statement(sql, table: str, columns: list, direction: str):
+    return sql.SQL("COPY {} ({}) " + direction).format(
+        sql.Identifier("public", table),
+        sql.SQL(", ").join(map(sql.Identifier, columns)),
+    )
+
+
+def dump(dsn: str, path: str, tables=None, jobs: int = DEFAULT_JOBS,
+         chunk_size: int = DEFAULT_CHUNK_SIZE, scrubber=None) -> dict:
+    """Dump tables in parallel into a snapshot archive; return its manifest"""
+    psycopg, sql = _import_psycopg()
+    tables = list(tables or TABLES)
+    chunks = queue.Queue(maxsize=jobs * 2)
+    cancelled = threading.Event()
+    done = object()
+
+    def put(item):
+        while not cancelled.is_set():
+            try:
+                chunks.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        raise RuntimeError("Dump cancelled")
+
+    def dump_table(snapshot_id: str, table: str):
+        with psycopg.connect(dsn, autocommit=True) as conn:
+            conn.execute("BEGIN ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+            conn.execute(sql.SQL("SET TRANSACTION SNAPSHOT {}").format(sql.Literal(snapshot_id)))
+            columns = _table_columns(conn, table)
+            put(("columns", table, columns))
+            with conn.cursor() as cur, cur.copy(_copy_statement(sql, table, columns, "TO STDOUT")) as copy:
+                for index, data in enumerate(iter_chunks(map(bytes, copy), chunk_size)):
+                    if scrubber:
+                        data = scrubber(table, columns, data)
+                    put(("chunk", table, index, gzip.compress(data, compresslevel=6), data.count(b"\n")))
+            conn.execute("COMMIT")
+
+    # Write next to the target and rename on success, so a failed dump never
+    # leaves a truncated archive or replaces an earlier good snapshot
+    fd, partial = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.", suffix=".partial",
+        dir=os.path.dirname(os.path.abspath(path)),
+    )
+    os.close(fd)
+    writer = SnapshotWriter(partial)
+    try:
+        with psycopg.connect(dsn, autocommit=True) as coordinator:
+            # Hold the exported snapshot open until every worker has finished
+            coordinator.execute("BEGIN ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+            snapshot_id = coordinator.execute("SELECT pg_export_snapshot()").fetchone()[0]
+
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                futures = [pool.submit(dump_table, snapshot_id, table) for table in tables]
+
+                def finish():
+                    for future in futures:
+                        future.exception()
+                    chunks.put(done)
+
+                threading.Thread(target=finish, daemon=True).start()
+
+                try:
+                    while True:
+                        item = chunks.get()
+                        if item is done:
+                            break
+                        if item[0] == "columns":
+                            writer.set_columns(item[1], item[2])
+                        else:
+                            _, table, index, payload, rows = item
+                            writer.add_chunk(table, index, payload, rows)
+                except BaseException:
+                    cancelled.set()
+                    raise
+                for future in futures:
+                    future.result()
+
+            coordinator.execute("COMMIT")
+
+        manifest = writer.close(scrubbed=scrubber is not None)
+        os.replace(partial, path)
+    finally:
+        writer.tar.close()
+        if os.path.exists(partial):
+            os.unlink(partial)
+    return manifest
+
+
+def restore(dsn: str, path: str, jobs: int = DEFAULT_JOBS, scrubber=None,
+            truncate: bool = False, triggers: str = "disable") -> dict:
+    """Load a snapshot archive; return {table: rows loaded}
+
+    ``triggers`` controls user triggers on the snapshot tables while loading:
+        "disable"  ALTER TABLE ... DISABLE TRIGGER USER, re-enabled afterwards
+                   (default; FK checks still run)
+        "replica"  session_replication_role = replica on the load connections,
+                   which also skips FK checks (e.g. unscrubbed auth.users refs)
+        "keep"     leave triggers firing
+    Triggers such as sync_ip_record_status on process_tracking would otherwise
+    rewrite ip_records.status/updated_at in whatever order chunks land and
+    queue notification emails.
+    """
+    if triggers not in TRIGGER_MODES:
+        raise ValueError(f"triggers must be one of {', '.join(TRIGGER_MODES)}")
+    psycopg, sql = _import_psycopg()
+    reader = SnapshotReader(path)
+    connections = []
+    disabled = []
+    admin = None
+    local = threading.local()
+    lock = threading.Lock()
+    loaded = {}
+
+    def connection():
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = psycopg.connect(dsn, autocommit=True)
+            if triggers == "replica":
+                conn.execute("SET session_replication_role = replica")
+            local.conn = conn
+            with lock:
+                connections.append(conn)
+        return conn
+
+    def load_chunk(table: str, columns: list, payload: bytes, rows: int):
+        data = gzip.decompress(payload)
+        if scrubber:
+            data = scrubber(table, columns, data)
+        conn = connection()
+        with conn.transaction(), conn.cursor() as cur:
+            with cur.copy(_copy_statement(sql, table, columns, "FROM STDIN")) as copy:
+                copy.write(data)
+        with lock:
+            loaded[table] = loaded.get(table, 0) + rows
+
+    try:
+        # Check every chunk before anything is truncated or loaded, so a
+        # corrupt archive cannot leave staging emptied or half restored
+        reader.verify()
+        tables = reader.tables
+        admin = psycopg.connect(dsn, autocommit=True)
+        if triggers == "disable":
+            for table in tables:
+                admin.execute(sql.SQL("ALTER TABLE {} DISABLE TRIGGER USER").format(sql.Identifier("public", table)))
+                disabled.append(table)
+        if truncate:
+            admin.execute(sql.SQL("TRUNCATE {} CASCADE").format(
+                sql.SQL(", ").join(sql.Identifier("public", t) for t in tables)
+            ))
+
+        slots = threading.BoundedSemaphore(jobs * 2)
+
+        def release(future):
+            slots.release()
+
+        # One pool for every level so each worker thread keeps its single
+        # connection; at most `jobs` load connections plus the admin one
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            for level in restore_levels(tables):
+                futures = []
+                for table in level:
+                    entry = tables[table]
+                    for chunk in entry["chunks"]:
+                        slots.acquire()
+                        try:
+                            payload = reader.read_chunk(chunk)
+                        except BaseException:
+                            slots.release()
+                            raise
+                        future = pool.submit(load_chunk, table, entry["columns"], payload, chunk["rows"])
+                        future.add_done_callback(release)
+                        futures.append(future)
+                for future in futures:
+                    future.result()
+    finally:
+        for conn in connections:
+            conn.close()
+        reader.close()
+        if admin is not None:
+            try:
+                for table in disabled:
+                    admin.execute(sql.SQL("ALTER TABLE {} ENABLE TRIGGER USER").format(sql.Identifier("public", table)))
+            finally:
+                admin.close()
+
+    return loaded
+
+
+# ---------------------------------------------------------------------------
+# Command
+# ---------------------------------------------------------------------------
+
+def _dsn(args) -> str:
+    return args.dsn or os.getenv("SUPABASE_DB_URL") or os.getenv("DATABASE_URL")
+
+
+def dry_run(args) -> int:
+    """Describe a dump, or verify a restore archive, without touching the network"""
+    print("🧪 Dry run - no database connection will be made\n")
+
+    if args.action == "dump":
+        tables = args.table or list(TABLES)
+        print(f"📦 Would dump {len(tables)} tables to {args.archive} with {args.jobs} workers")
+        print(f"   chunk size: {args.chunk_size} MiB, scrub: {'yes' if args.scrub else 'no'}")
+        for table in tables:
+            print(f"  • {table}")
+        return 0
+
+    try:
+        reader = SnapshotReader(args.archive)
+    except (OSError, ValueError, tarfile.TarError) as e:
+        print(f"❌ Cannot read snapshot: {e}")
+        return 1
+    try:
+        count = reader.verify()
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        reader.close()
+
+    manifest = reader.manifest
+    print(f"✅ {count} chunks verified in {args.archive} (created {manifest['created_at']})")
+    triggers = "left on" if args.keep_triggers else "skipped with FK checks" if args.skip_fk_checks else "disabled"
+    print(f"📥 Would restore with {args.jobs} workers{', truncating first' if args.truncate else ''}, triggers {triggers}:")
+    for number, level in enumerate(restore_levels(reader.tables), 1):
+        for table in level:
+            print(f"  {number}. {table}: {reader.tables[table]['rows']} rows")
+    return 0
+
+
+def run(args) -> int:
+    """Entry point for ``ucc-ipo snapshot``"""
+    unknown = [t for t in (getattr(args, "table", None) or []) if t not in TABLES]
+    if unknown:
+        print(f"❌ Unknown table(s): {', '.join(unknown)}. Choose from: {', '.join(TABLES)}")
+        return 1
+
+    if args.dry_run:
+        return dry_run(args)
+
+    dsn = _dsn(args)
+    if not dsn:
+        print("❌ No database URL. Pass --dsn or set SUPABASE_DB_URL.")
+        return 1
+
+    scrubber = Scrubber() if args.scrub else None
+    try:
+        if args.action == "dump":
+            manifest = dump(dsn, args.archive, args.table, args.jobs, args.chunk_size * 1024 * 1024, scrubber)
+            print(f"✅ Snapshot written to {args.archive}")
+            for table, entry in manifest["tables"].items():
+                print(f"  • {table}: {entry['rows']} rows in {len(entry['chunks'])} chunks")
+        else:
+            triggers = "keep" if args.keep_triggers else "replica" if args.skip_fk_checks else "disable"
+            loaded = restore(dsn, args.archive, args.jobs, scrubber, args.truncate, triggers)
+            print(f"✅ Snapshot restored from {args.archive}")
+            for table, rows in loaded.items():
+                print(f"  • {table}: {rows} rows")
+    except Exception as e:
+        print(f"❌ Snapshot {args.action} failed: {e}")
+        return 1
+    return 0